@@ -0,0 +1,36 @@
+# build_extension.py
+
+"""
+Compile the measurement kernels ahead of time into the qpu_kernels
+extension module, so middleware_hardware can skip Numba's JIT warm-up:
+
+    python build_extension.py
+
+middleware_hardware falls back to JIT-compiling the same kernels when the
+extension has not been built.
+"""
+
+import os
+
+from numba.pycc import CC
+
+import middleware_kernels
+
+cc = CC('qpu_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('reduce_meas', 'Tuple((u1, f8))(u1[:, ::1])')(
+    middleware_kernels.reduce_measurements)
+cc.export('sample_and_pack', 'void(f8[::1], i8, u8[::1], f8[::1])')(
+    middleware_kernels.sample_and_pack)
+
+# Baked into the extension so middleware_hardware can tell when it is stale
+KERNELS_HASH = middleware_kernels.source_hash()
+
+def kernels_hash():
+    return KERNELS_HASH
+
+cc.export('kernels_hash', 'i8()')(kernels_hash)
+
+if __name__ == "__main__":
+    cc.compile()
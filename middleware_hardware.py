@@ -1,12 +1,28 @@
 # middleware_hardware.py
 
 import cirq
+import numba
 import numpy as np
+import sympy
+from collections import OrderedDict, namedtuple
 from typing import List, Dict, Optional
 from enum import Enum
 import logging
 from dataclasses import dataclass
 
+import middleware_kernels
+
+try:
+    import qsimcirq
+except ImportError:  # qsim is optional, fall back to cirq's simulator
+    qsimcirq = None
+
+try:
+    from numba import cuda
+    from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float64
+except ImportError:  # numba without CUDA support, the GPU backend is unavailable
+    cuda = None
+
 # Configure logging with more detailed output
 logging.basicConfig(
     level=logging.INFO,
@@ -28,20 +44,324 @@ class QPUConfig:
     gate_fidelity: float = 0.99
     readout_fidelity: float = 0.98
 
+# Gate families whose unitary exists for every (real) parameter value, so a
+# symbolic instance is known to be unitary before its parameters are resolved
+_ALWAYS_UNITARY_GATES = (cirq.EigenGate, cirq.PhasedXZGate, cirq.PhasedXPowGate)
+
+def _is_unitary(op: cirq.Operation) -> bool:
+    """Whether op is unitary, whatever values its parameters resolve to"""
+    if cirq.is_parameterized(op):
+        return isinstance(op.gate, _ALWAYS_UNITARY_GATES)
+    return cirq.has_unitary(op)
+
+def _terminal_measurement(circuit: cirq.Circuit) -> Optional[cirq.Operation]:
+    """Return the circuit's measurement if it is a single terminal measurement
+    of every qubit preceded only by unitary gates, otherwise None"""
+    if len(circuit) == 0:
+        return None
+    last_moment = circuit[-1]
+    if len(last_moment) != 1:
+        return None
+    measurement = next(iter(last_moment))
+    gate = measurement.gate
+    if not isinstance(gate, cirq.MeasurementGate) or any(gate.full_invert_mask()) or gate.confusion_map:
+        return None
+    if set(measurement.qubits) != circuit.all_qubits():
+        return None
+    if not all(_is_unitary(op) for op in circuit[:-1].all_operations()):
+        return None
+    return measurement
+
+MeasurementSummary = namedtuple('MeasurementSummary', ['first_bit', 'mean'])
+
+try:
+    # Ahead-of-time compiled kernels, see build_extension.py
+    import qpu_kernels
+except ImportError:
+    qpu_kernels = None
+
+if qpu_kernels is not None and not (
+        hasattr(qpu_kernels, 'kernels_hash')
+        and qpu_kernels.kernels_hash() == middleware_kernels.source_hash()):
+    logger.warning("qpu_kernels extension is out of date with middleware_kernels.py, "
+                   "ignoring it; rerun build_extension.py")
+    qpu_kernels = None
+
+if qpu_kernels is not None:
+    logger.debug("Using ahead-of-time compiled kernels from qpu_kernels")
+    _reduce_kernel = qpu_kernels.reduce_meas
+    _sample_and_pack = qpu_kernels.sample_and_pack
+else:
+    logger.debug("Using JIT-compiled kernels from middleware_kernels")
+    _reduce_kernel = numba.njit(cache=True, fastmath=True)(
+        middleware_kernels.reduce_measurements)
+    _sample_and_pack = numba.njit(parallel=True, fastmath=True, cache=True)(
+        middleware_kernels.sample_and_pack)
+    # Compile (or load from cache) at import time rather than on the first frame
+    _reduce_kernel(np.zeros((1, 1), dtype=np.uint8))
+    _sample_and_pack(np.ones(1), 1, np.empty(1, dtype=np.uint64), np.zeros(1))
+
+def _reduce_measurements(meas: np.ndarray) -> MeasurementSummary:
+    """Summarize a C-contiguous uint8 measurement array in a single pass"""
+    return MeasurementSummary(*_reduce_kernel(meas))
+
+# qsim only accepts matrix gates on up to 6 qubits, and beyond that the dense
+# 2^n x 2^n ladder unitary is slower than the CNOTs on cirq.Simulator too
+_MAX_LADDER_MATRIX_QUBITS = 6
+
+_CNOT_MATRIX = np.array([[1, 0, 0, 0],
+                         [0, 1, 0, 0],
+                         [0, 0, 0, 1],
+                         [0, 0, 1, 0]], dtype=np.complex128)
+
+def _cnot_ladder_matrix(num_qubits: int) -> np.ndarray:
+    """Unitary of CNOT(q0, q1), CNOT(q1, q2), ... applied in order, in
+    cirq's big-endian qubit ordering"""
+    unitary = np.eye(1 << num_qubits, dtype=np.complex128)
+    for i in range(num_qubits - 1):
+        cnot = np.kron(np.kron(np.eye(1 << i), _CNOT_MATRIX),
+                       np.eye(1 << (num_qubits - i - 2)))
+        unitary = cnot @ unitary
+    return unitary
+
+def _unpack_samples(samples: np.ndarray, num_qubits: int) -> np.ndarray:
+    """Expand sampled basis-state indices into per-qubit bits (big-endian),
+    shaped and typed like cirq's measurement arrays"""
+    as_bytes = samples.astype('>u4').view(np.uint8)
+    return np.unpackbits(as_bytes).reshape(len(samples), 32)[:, -num_qubits:].view(np.int8)
+
+# Simulation backends selectable on QPUHardwareInterface
+BACKENDS = ('cirq', 'numba_cuda')
+# Below this many qubits kernel launch overhead outweighs the GPU's bandwidth.
+# Default for QPUHardwareInterface(cuda_min_qubits=...)
+CUDA_MIN_QUBITS = 14
+_CUDA_THREADS_PER_BLOCK = 256
+
+if cuda is not None:
+    @cuda.jit
+    def _cuda_apply_single_qubit(state, bit, m00, m01, m10, m11):
+        """Apply a 2x2 unitary to the qubit at bit position `bit`, one thread
+        per pair of amplitudes"""
+        k = cuda.grid(1)
+        if k < state.size // 2:
+            low = k & (bit - 1)
+            i0 = ((k ^ low) << 1) | low
+            i1 = i0 | bit
+            a0 = state[i0]
+            a1 = state[i1]
+            state[i0] = m00 * a0 + m01 * a1
+            state[i1] = m10 * a0 + m11 * a1
+
+    @cuda.jit
+    def _cuda_apply_cnot(state, control_bit, target_bit):
+        """Apply a CNOT, one thread per pair of amplitudes differing in the target"""
+        k = cuda.grid(1)
+        if k < state.size // 2:
+            low = k & (target_bit - 1)
+            i0 = ((k ^ low) << 1) | low
+            if i0 & control_bit:
+                i1 = i0 | target_bit
+                tmp = state[i0]
+                state[i0] = state[i1]
+                state[i1] = tmp
+
+    @cuda.jit
+    def _cuda_probabilities(state, probs):
+        i = cuda.grid(1)
+        if i < state.size:
+            a = state[i]
+            probs[i] = a.real * a.real + a.imag * a.imag
+
+    @cuda.jit
+    def _cuda_scan_step(src, dst, offset):
+        """One Hillis-Steele pass of an inclusive prefix sum"""
+        i = cuda.grid(1)
+        if i < src.size:
+            if i >= offset:
+                dst[i] = src[i] + src[i - offset]
+            else:
+                dst[i] = src[i]
+
+    @cuda.jit
+    def _cuda_sample(cdf, rng_states, samples):
+        """Draw one basis state per thread by binary search over the CDF"""
+        i = cuda.grid(1)
+        if i < samples.size:
+            u = xoroshiro128p_uniform_float64(rng_states, i) * cdf[cdf.size - 1]
+            lo = 0
+            hi = cdf.size - 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if cdf[mid] > u:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            samples[i] = lo
+
+def _cuda_blocks(num_threads: int) -> int:
+    return (num_threads + _CUDA_THREADS_PER_BLOCK - 1) // _CUDA_THREADS_PER_BLOCK
+
+class _CudaStateVectorSimulator:
+    """Minimal GPU state-vector simulator built on Numba-CUDA kernels.
+    Handles circuits of single-qubit gates and CNOTs ending in a single
+    terminal measurement, with amplitudes kept in device memory"""
+
+    @staticmethod
+    def supports(circuit: cirq.Circuit) -> bool:
+        """Whether every gate before the terminal measurement has a kernel"""
+        for op in circuit[:-1].all_operations():
+            if op.gate == cirq.CNOT:
+                continue
+            if len(op.qubits) != 1 or not _is_unitary(op):
+                return False
+        return True
+
+    def sample(self, circuit: cirq.Circuit, measurement: cirq.Operation,
+               param_resolver: cirq.ParamResolver, repetitions: int,
+               seed: int) -> np.ndarray:
+        """Simulate the circuit on the GPU and return sampled basis-state indices"""
+        resolved = cirq.resolve_parameters(circuit[:-1], param_resolver)
+        num_qubits = len(measurement.qubits)
+        bits = {q: 1 << (num_qubits - 1 - i) for i, q in enumerate(measurement.qubits)}
+        
+        state = np.zeros(1 << num_qubits, dtype=np.complex64)
+        state[0] = 1
+        d_state = cuda.to_device(state)
+        pair_blocks = _cuda_blocks(state.size // 2)
+        for op in resolved.all_operations():
+            if op.gate == cirq.CNOT:
+                control, target = op.qubits
+                _cuda_apply_cnot[pair_blocks, _CUDA_THREADS_PER_BLOCK](
+                    d_state, bits[control], bits[target])
+            else:
+                m = cirq.unitary(op).astype(np.complex64)
+                _cuda_apply_single_qubit[pair_blocks, _CUDA_THREADS_PER_BLOCK](
+                    d_state, bits[op.qubits[0]], m[0, 0], m[0, 1], m[1, 0], m[1, 1])
+        
+        d_probs = cuda.device_array(state.size, dtype=np.float64)
+        _cuda_probabilities[_cuda_blocks(state.size), _CUDA_THREADS_PER_BLOCK](d_state, d_probs)
+        # Turn the probabilities into a CDF in device memory, log2(2^n) passes
+        d_cdf, d_scratch = d_probs, cuda.device_array_like(d_probs)
+        offset = 1
+        while offset < state.size:
+            _cuda_scan_step[_cuda_blocks(state.size), _CUDA_THREADS_PER_BLOCK](
+                d_cdf, d_scratch, offset)
+            d_cdf, d_scratch = d_scratch, d_cdf
+            offset <<= 1
+        
+        rng_states = create_xoroshiro128p_states(repetitions, seed=seed)
+        d_samples = cuda.device_array(repetitions, dtype=np.int64)
+        _cuda_sample[_cuda_blocks(repetitions), _CUDA_THREADS_PER_BLOCK](d_cdf, rng_states, d_samples)
+        return d_samples.copy_to_host()
+
 class QPUHardwareInterface:
     """Interface for controlling the physical QPU hardware"""
     
-    def __init__(self, test_mode: bool = True):
-        self.config = QPUConfig()
+    def __init__(self, test_mode: bool = True, seed: Optional[int] = None,
+                 config: Optional[QPUConfig] = None, backend: str = 'cirq',
+                 cuda_min_qubits: int = CUDA_MIN_QUBITS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+        self.config = config if config is not None else QPUConfig()
         self.status = QPUStatus.READY
         self.error_mitigation_enabled = True
         self.test_mode = test_mode
+        self.backend = backend
+        self._simulator = self._create_simulator()
+        # The GPU path is opt-in and only used for circuits of at least
+        # cuda_min_qubits qubits; everything else stays on the cirq path
+        self.cuda_min_qubits = cuda_min_qubits
+        self._cuda_simulator = None
+        if backend == 'numba_cuda':
+            if cuda is not None and cuda.is_available():
+                self._cuda_simulator = _CudaStateVectorSimulator()
+            else:
+                logger.warning("Numba-CUDA backend requested but no CUDA device is available, "
+                               "using the cirq backend")
+        # Persistent sampling state, reused by every execute_circuit call
+        self._rng = np.random.default_rng(seed)
+        self._probs = np.empty(1 << self.config.num_qubits, dtype=np.float64)
+        self._uniforms = np.empty(100, dtype=np.float64)
+        self._packed = np.empty(100, dtype=np.uint64)
         print(f"\nInitializing QPU Interface (Test Mode: {test_mode})")
         print(f"Configuration: {self.config}")
+        print(f"Simulator backend: {type(self._simulator).__name__}"
+              + (" (Numba-CUDA for large circuits)" if self._cuda_simulator else ""))
+
+    @staticmethod
+    def _create_simulator() -> cirq.SimulatesFinalState:
+        """Create the simulator used in test mode, preferring qsim when installed"""
+        if qsimcirq is not None:
+            try:
+                # Single-threaded: the register is a handful of qubits, far
+                # too small to amortize thread start-up. No circuit
+                # memoization: each frame resolves new parameter values, so
+                # the cache would never hit and only adds equality checks.
+                return qsimcirq.QSimSimulator(qsim_options={'t': 1, 'f': 2})
+            except Exception as e:
+                logger.warning("Failed to initialize qsim, using cirq.Simulator: %s", e)
+        return cirq.Simulator(dtype=np.complex64)
+
+    @property
+    def benefits_from_fused_gates(self) -> bool:
+        """Whether fusing fixed gate sequences into dense matrix gates speeds
+        up the active simulator. qsim fuses gates itself and runs the plain
+        gates faster, so only cirq.Simulator benefits."""
+        return isinstance(self._simulator, cirq.Simulator)
+
+    def _run_sweep(self, circuit: cirq.Circuit, sweep: cirq.Sweepable,
+                   repetitions: int, key: str) -> List[np.ndarray]:
+        """Run the circuit for every parameter set in the sweep and return the
+        (repetitions, qubits) measurement array recorded under key for each run"""
+        measurement = _terminal_measurement(circuit)
+        if measurement is None:
+            results = self._simulator.run_sweep(circuit, params=sweep, repetitions=repetitions)
+            return [result.measurements[key] for result in results]
+        if cirq.measurement_key_name(measurement) != key:
+            raise KeyError(key)
+        
+        num_qubits = len(measurement.qubits)
+        if (self._cuda_simulator is not None and num_qubits >= self.cuda_min_qubits
+                and self._cuda_simulator.supports(circuit)):
+            return [
+                _unpack_samples(
+                    self._cuda_simulator.sample(circuit, measurement, resolver, repetitions,
+                                                seed=int(self._rng.integers(2**63))),
+                    num_qubits)
+                for resolver in cirq.to_resolvers(sweep)
+            ]
+        
+        # Simulate the unitary part once per parameter set and sample the
+        # terminal measurement from the final state, instead of evolving
+        # the state once per shot
+        states = self._simulator.simulate_sweep(
+            circuit[:-1], params=sweep, qubit_order=measurement.qubits
+        )
+        return [
+            self._sample_final_state(state.final_state_vector, num_qubits, repetitions)
+            for state in states
+        ]
+
+    def _sample_final_state(self, final_state: np.ndarray, num_qubits: int,
+                            repetitions: int) -> np.ndarray:
+        """Sample a measurement of every qubit from the final state vector"""
+        if final_state.size == self._probs.size:
+            probs = self._probs
+        else:
+            probs = np.empty(final_state.size, dtype=np.float64)
+        np.abs(final_state, out=probs)
+        np.square(probs, out=probs)
+
+        if self._uniforms.size != repetitions:
+            self._uniforms = np.empty(repetitions, dtype=np.float64)
+            self._packed = np.empty(repetitions, dtype=np.uint64)
+        self._rng.random(out=self._uniforms)
+        _sample_and_pack(probs, repetitions, self._packed, self._uniforms)
+        return _unpack_samples(self._packed, num_qubits)
         
     def check_status(self) -> QPUStatus:
         """Check the current status of the QPU hardware"""
-        print(f"Current QPU status: {self.status.value}")
+        logger.debug("Current QPU status: %s", self.status.value)
         return self.status
     
     def calibrate(self) -> bool:
@@ -61,83 +381,177 @@ class QPUHardwareInterface:
             self.status = QPUStatus.ERROR
             return False
 
-    def execute_circuit(self, circuit: cirq.Circuit) -> Optional[Dict]:
-        """Execute a quantum circuit on the physical QPU"""
+    def execute_circuit(self, circuit: cirq.Circuit,
+                        param_resolver: cirq.ParamResolverOrSimilarType = None,
+                        key: str = 'result') -> Optional[np.ndarray]:
+        """Execute a (possibly parameterized) quantum circuit on the physical QPU
+        and return the measurements recorded under key"""
         if self.status != QPUStatus.READY:
             raise RuntimeError(f"QPU not ready. Current status: {self.status}")
         
         try:
-            print("\nExecuting quantum circuit:")
-            print(circuit)
+            # Rendering the circuit is expensive, only do it when it is logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Executing quantum circuit:\n%s",
+                             cirq.resolve_parameters(circuit, param_resolver))
             
             # Use simulator in test mode
-            simulator = cirq.Simulator()
-            result = simulator.run(circuit, repetitions=100)
-            print("Circuit execution completed successfully")
-            return {'measurements': result.measurements}
+            measurements = self._run_sweep(
+                circuit, cirq.ParamResolver(param_resolver), repetitions=100, key=key
+            )[0]
+            logger.debug("Circuit execution completed successfully")
+            return measurements
         except Exception as e:
             print(f"Error: Circuit execution failed - {str(e)}")
             self.status = QPUStatus.ERROR
             return None
 
+    def execute_sweep(self, circuit: cirq.Circuit, sweep: cirq.Sweepable,
+                      key: str = 'result') -> Optional[List[np.ndarray]]:
+        """Execute a parameterized quantum circuit once per parameter set and
+        return the measurements recorded under key for each run"""
+        if self.status != QPUStatus.READY:
+            raise RuntimeError(f"QPU not ready. Current status: {self.status}")
+        
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                # Materialize the resolvers so the sweep isn't consumed here
+                sweep = list(cirq.to_resolvers(sweep))
+                logger.debug("Executing quantum circuit sweep of %d runs, first run:\n%s",
+                             len(sweep),
+                             cirq.resolve_parameters(circuit, sweep[0]) if sweep else circuit)
+            
+            # Use simulator in test mode
+            sweep_measurements = self._run_sweep(circuit, sweep, repetitions=100, key=key)
+            logger.debug("Circuit sweep completed successfully (%d runs)",
+                         len(sweep_measurements))
+            return sweep_measurements
+        except Exception as e:
+            print(f"Error: Circuit sweep failed - {str(e)}")
+            self.status = QPUStatus.ERROR
+            return None
+
 class QuantumPatternRecognition:
     """Quantum pattern recognition for robot vision processing"""
+
+    # Maximum number of parameterized circuit templates kept around; there is
+    # one per encoded input length, so only registers wider than this evict
+    TEMPLATE_CACHE_SIZE = 8
     
     def __init__(self, qpu_interface: QPUHardwareInterface):
         self.qpu = qpu_interface
         self.qubits = [cirq.GridQubit(i, 0) for i in range(self.qpu.config.num_qubits)]
-        print("Initialized Quantum Pattern Recognition module")
-    
-    def create_recognition_circuit(self, input_data: List[float]) -> cirq.Circuit:
-        """Create a quantum circuit for pattern recognition"""
-        circuit = cirq.Circuit()
+        self._symbol_names = [f"t{i}" for i in range(len(self.qubits))]
         
-        # Initialize qubits in superposition
-        circuit.append([cirq.H(q) for q in self.qubits])
+        # Every operation of the recognition circuit is built once here;
+        # templates only select and assemble them.
+        # H followed by Y**t equals (up to global phase) a single PhasedXZ
+        # gate with x = t + 1/2, which halves the single-qubit gate count
+        # while staying parameterized.
+        self._encode_ops = [
+            cirq.PhasedXZGate(
+                x_exponent=sympy.Symbol(name) + 0.5,
+                z_exponent=1,
+                axis_phase_exponent=-0.5,
+            ).on(q)
+            for name, q in zip(self._symbol_names, self.qubits)
+        ]
+        self._h_ops = [cirq.H(q) for q in self.qubits]
+        # The entangling ladder does not depend on the input, so on
+        # simulators that apply gates one by one, small registers apply it
+        # as one precomputed gate instead of n-1 CNOTs
+        if (self.qpu.benefits_from_fused_gates
+                and 2 <= len(self.qubits) <= _MAX_LADDER_MATRIX_QUBITS):
+            self._ladder_matrix = _cnot_ladder_matrix(len(self.qubits))
+            self._entangle_ops = [cirq.MatrixGate(self._ladder_matrix).on(*self.qubits)]
+        else:
+            self._ladder_matrix = None
+            self._entangle_ops = [cirq.CNOT(self.qubits[i], self.qubits[i + 1])
+                                  for i in range(len(self.qubits) - 1)]
+        self._measure_op = cirq.measure(*self.qubits, key='result')
         
-        # Encode classical data into quantum state
-        for i, data in enumerate(input_data):
-            if i >= len(self.qubits):
-                break
-            # Use proper Cirq rotation gates
-            circuit.append(cirq.Y(self.qubits[i]) ** (data/np.pi))
+        # Templates keyed by the number of encoded input values
+        self._templates: "OrderedDict[int, cirq.Circuit]" = OrderedDict()
+        # The common case (one value per qubit) is built up front
+        self._get_template(len(self.qubits))
+        print("Initialized Quantum Pattern Recognition module")
+
+    def _get_template(self, num_encoded: int) -> cirq.Circuit:
+        """Return the parameterized recognition circuit encoding num_encoded values"""
+        template = self._templates.get(num_encoded)
+        if template is not None:
+            self._templates.move_to_end(num_encoded)
+            return template
         
-        # Add entangling layers
-        for i in range(len(self.qubits) - 1):
-            circuit.append(cirq.CNOT(self.qubits[i], self.qubits[i + 1]))
+        template = cirq.Circuit(
+            # Superposition plus data encoding on the first num_encoded
+            # qubits, plain superposition on the rest
+            self._encode_ops[:num_encoded],
+            self._h_ops[num_encoded:],
+            # Entangling layers
+            self._entangle_ops,
+            # Measurement
+            self._measure_op,
+        )
         
-        # Measurement
-        circuit.append(cirq.measure(*self.qubits, key='result'))
-        return circuit
+        self._templates[num_encoded] = template
+        if len(self._templates) > self.TEMPLATE_CACHE_SIZE:
+            self._templates.popitem(last=False)
+        return template
+
+    def _resolver(self, input_data: List[float]) -> cirq.ParamResolver:
+        """Map input data onto the rotation parameters of the template"""
+        return cirq.ParamResolver({
+            name: data / np.pi for name, data in zip(self._symbol_names, input_data)
+        })
+    
+    def create_recognition_circuit(self, input_data: List[float]) -> cirq.Circuit:
+        """Create a quantum circuit for pattern recognition"""
+        template = self._get_template(min(len(input_data), len(self.qubits)))
+        return cirq.resolve_parameters(template, self._resolver(input_data))
     
     def process_vision_data(self, vision_data: List[float]) -> Dict:
         """Process vision data using quantum pattern recognition"""
-        print(f"\nProcessing vision data: {vision_data}")
+        return self.process_vision_data_batch(np.asarray([vision_data], dtype=np.float64))[0]
+
+    def process_vision_data_batch(self, frames: np.ndarray) -> List[Dict]:
+        """Process a batch of vision frames (one frame per row) with a single
+        parameter sweep over the recognition circuit"""
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.ndim != 2:
+            raise ValueError(f"Expected a 2-D array of frames, got shape {frames.shape}")
+        logger.debug("Processing vision data: %s", frames)
         
         if self.qpu.check_status() != QPUStatus.READY:
             self.qpu.calibrate()
         
-        circuit = self.create_recognition_circuit(vision_data)
-        result = self.qpu.execute_circuit(circuit)
+        template = self._get_template(min(frames.shape[1], len(self.qubits)))
+        sweep = cirq.ListSweep([self._resolver(frame) for frame in frames])
+        results = self.qpu.execute_sweep(template, sweep)
         
-        if result is None:
+        if results is None:
             raise RuntimeError("Pattern recognition failed")
         
-        return self._post_process_results(result)
+        return [self._post_process_results(measurements) for measurements in results]
     
-    def _post_process_results(self, raw_results: Dict) -> Dict:
+    def _post_process_results(self, measurements: np.ndarray) -> Dict:
         """Post-process the quantum measurements"""
-        measurements = raw_results['measurements']['result']
+        measurements = np.ascontiguousarray(measurements)
+        if measurements.dtype == np.int8:
+            # cirq reports bits as int8, reinterpret them without a copy
+            measurements = measurements.view(np.uint8)
+        elif measurements.dtype != np.uint8:
+            measurements = measurements.astype(np.uint8)
         # Calculate confidence based on measurement statistics
-        confidence = np.mean(measurements)
+        summary = _reduce_measurements(measurements)
         
         processed_results = {
-            'pattern_identified': bool(measurements[0][0]),
-            'confidence_score': float(confidence)
+            'pattern_identified': bool(summary.first_bit),
+            'confidence_score': float(summary.mean)
         }
-        print(f"\nPattern recognition results:")
-        print(f"Pattern Identified: {processed_results['pattern_identified']}")
-        print(f"Confidence Score: {processed_results['confidence_score']:.2f}")
+        logger.debug("Pattern recognition results: identified=%s, confidence=%.2f",
+                     processed_results['pattern_identified'],
+                     processed_results['confidence_score'])
         return processed_results
 
 def test_pattern_recognition():
@@ -155,9 +569,68 @@ def test_pattern_recognition():
     # Process test data
     try:
         result = pattern_recognition.process_vision_data(test_vision_data)
+        print(f"\nPattern recognition results:")
+        print(f"Pattern Identified: {result['pattern_identified']}")
+        print(f"Confidence Score: {result['confidence_score']:.2f}")
         print("\nTest completed successfully!")
     except Exception as e:
         print(f"\nError during testing: {str(e)}")
 
+def test_register_sizes():
+    """Test pattern recognition on registers around the ladder-matrix limit"""
+    print("\nTesting pattern recognition on larger registers")
+    print("=" * 60)
+    
+    for num_qubits in (_MAX_LADDER_MATRIX_QUBITS, 7, 8):
+        qpu = QPUHardwareInterface(test_mode=True, config=QPUConfig(num_qubits=num_qubits))
+        pattern_recognition = QuantumPatternRecognition(qpu)
+        test_vision_data = np.linspace(0.1, 0.9, num_qubits)
+        # No try/except here: a simulator rejecting the circuit must fail the check
+        result = pattern_recognition.process_vision_data(test_vision_data)
+        assert result is not None, f"Pattern recognition failed on {num_qubits} qubits"
+        assert qpu.status == QPUStatus.READY, f"QPU left in {qpu.status} on {num_qubits} qubits"
+        print(f"{num_qubits} qubits: Confidence Score: {result['confidence_score']:.2f}")
+
+def test_cuda_backend():
+    """Compare the Numba-CUDA kernels against cirq on a small circuit.
+    Runs without a GPU under the CUDA simulator:
+    NUMBA_ENABLE_CUDASIM=1 python middleware_hardware.py"""
+    if cuda is None or not cuda.is_available():
+        print("\nSkipping Numba-CUDA backend test: no CUDA device or simulator")
+        return
+    print("\nTesting the Numba-CUDA backend against cirq")
+    print("=" * 60)
+    
+    qubits = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit(
+        [cirq.H(q) for q in qubits[:2]],
+        cirq.Y(qubits[2]) ** 0.3,
+        cirq.PhasedXZGate(x_exponent=0.7, z_exponent=0.25, axis_phase_exponent=-0.5)(qubits[3]),
+        [cirq.CNOT(a, b) for a, b in zip(qubits, qubits[1:])],
+        cirq.X(qubits[0]) ** 0.4,
+        cirq.measure(*qubits, key='result'),
+    )
+    measurement = _terminal_measurement(circuit)
+    cuda_simulator = _CudaStateVectorSimulator()
+    assert cuda_simulator.supports(circuit)
+    
+    expected = np.abs(cirq.final_state_vector(circuit[:-1], qubit_order=qubits)) ** 2
+    repetitions = 4096
+    samples = cuda_simulator.sample(circuit, measurement, cirq.ParamResolver({}),
+                                    repetitions, seed=1234)
+    observed = np.bincount(samples, minlength=expected.size) / repetitions
+    # A few standard deviations of the sampling error at p = 0.5
+    max_error = np.abs(observed - expected).max()
+    assert max_error < 0.04, f"CUDA distribution differs from cirq by {max_error:.3f}"
+    print(f"Max probability error vs cirq: {max_error:.3f}")
+    
+    # End to end through the interface, with the GPU threshold lowered
+    qpu = QPUHardwareInterface(test_mode=True, backend='numba_cuda', cuda_min_qubits=len(qubits))
+    result = qpu.execute_circuit(circuit)
+    assert result is not None and result.shape == (100, len(qubits))
+    print("Numba-CUDA backend test completed successfully!")
+
 if __name__ == "__main__":
     test_pattern_recognition()
+    test_register_sizes()
+    test_cuda_backend()
@@ -0,0 +1,52 @@
+# middleware_kernels.py
+
+"""
+Numerical kernels for the hardware middleware, kept free of decorators so
+they can be JIT-compiled at import by middleware_hardware or compiled ahead
+of time into the qpu_kernels extension by build_extension.py.
+"""
+
+import hashlib
+import inspect
+
+import numba
+import numpy as np
+
+def reduce_measurements(meas):
+    """Summarize a C-contiguous uint8 measurement array in a single pass:
+    the first measured bit and the mean of all bits"""
+    num_reps, num_bits = meas.shape
+    # Count set bits in an integer and divide once, rather than promoting
+    # every element to float64
+    total = 0
+    for i in range(num_reps):
+        for j in range(num_bits):
+            total += meas[i, j]
+    return meas[0, 0], total / meas.size
+
+def sample_and_pack(probs, n_shots, out_packed, rand_u01):
+    """Draw n_shots basis-state indices from the (unnormalized) probabilities
+    into out_packed, using one uniform variate per shot from rand_u01. Shots
+    are independent binary searches over the CDF, run in parallel under the
+    JIT build."""
+    cdf = np.cumsum(probs)
+    total = cdf[cdf.size - 1]
+    last = cdf.size - 1
+    for i in numba.prange(n_shots):
+        u = rand_u01[i] * total
+        lo = 0
+        hi = last
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if cdf[mid] > u:
+                hi = mid
+            else:
+                lo = mid + 1
+        out_packed[i] = lo
+
+def source_hash() -> int:
+    """Fingerprint of the kernel sources, used to detect a qpu_kernels
+    extension built from an older version of this module"""
+    source = inspect.getsource(reduce_measurements) + inspect.getsource(sample_and_pack)
+    # 60 bits, so the value fits the extension's int64 return type
+    return int(hashlib.sha256(source.encode()).hexdigest()[:15], 16)
@@ -5,19 +5,20 @@ import numpy as np
 
 class MockRobotService:
     """Mock robot service for testing without MyRobotLab"""
-    def move_decision(self, decision):
+    def move_decision(self, decision, distribution=None):
         print(f"Mock robot executing movement decision: {decision}")
 
 # Use mock service instead of actual MyRobotLab
 robot = MockRobotService()
 
-def create_quantum_circuit():
+# The circuit has a fixed shape and fixed angles, so the qubits, the circuit
+# and the simulator are built once at import and reused on every call
+_QUBITS = [cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)]
+
+def _build_quantum_circuit(qubits):
     """
     Define a quantum circuit to solve a simple optimization problem for robot motion.
     """
-    # Define qubits
-    qubits = [cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)]
-    
     # Create a simple optimization circuit
     circuit = cirq.Circuit()
     
@@ -36,19 +37,50 @@ def create_quantum_circuit():
     
     # Measure qubits
     circuit.append(cirq.measure(*qubits, key='result'))
-    
-    print("Created quantum circuit:")
-    print(circuit)
     return circuit
 
-def simulate_quantum_circuit():
+_CIRCUIT = _build_quantum_circuit(_QUBITS)
+# Everything before the terminal measurement
+_UNITARY_CIRCUIT = _CIRCUIT[:-1]
+_SIM = cirq.Simulator(dtype=np.complex64)
+
+# Unitary of the circuit above (without the measurement). Starting from
+# |00>, the outcome probabilities are the squared magnitudes of its first
+# column, so sampling needs no simulator at all.
+_UNITARY = cirq.unitary(_UNITARY_CIRCUIT)
+_PROBS = np.abs(_UNITARY[:, 0]) ** 2
+_PROBS /= _PROBS.sum()
+_RNG = np.random.default_rng()
+
+def create_quantum_circuit():
+    """
+    Return the quantum circuit used for robot motion optimization.
+    """
+    print("Created quantum circuit:")
+    print(_CIRCUIT)
+    return _CIRCUIT
+
+def simulate_quantum_circuit(use_cirq=False):
     """
-    Simulate the defined quantum circuit and return the results.
+    Simulate the defined quantum circuit and return the measurement counts,
+    keyed by the big-endian integer value of the measured bits like
+    cirq's Result.histogram. Pass use_cirq=True to run the state-vector
+    simulation through cirq instead of the precomputed unitary.
     """
-    circuit = create_quantum_circuit()
-    simulator = cirq.Simulator()
-    result = simulator.run(circuit, repetitions=100)
-    counts = result.histogram(key='result')
+    if use_cirq:
+        # The only measurement is terminal, so simulate the state once and
+        # sample all repetitions from it instead of re-running the circuit
+        final_state = _SIM.simulate(_UNITARY_CIRCUIT, qubit_order=_QUBITS).final_state_vector
+        probs = np.abs(final_state).astype(np.float64) ** 2
+        probs /= probs.sum()
+    else:
+        probs = _PROBS
+    samples = _RNG.choice(len(probs), size=100, p=probs)
+    counts = {
+        outcome: int(count)
+        for outcome, count in enumerate(np.bincount(samples, minlength=len(probs)))
+        if count
+    }
     print(f"\nSimulation Results (100 repetitions):")
     print(f"Measurement counts: {counts}")
     return counts
@@ -67,7 +99,7 @@ def optimize_movement():
         # Choose the movement with the highest count
         movement_decision = max(simulation_results, key=simulation_results.get)
         # Map the decision to robot movement commands
-        robot.move_decision(movement_decision)
+        robot.move_decision(movement_decision, simulation_results)
         print(f"\nOptimization complete!")
         print(f"Most frequent measurement: {movement_decision}")
         print(f"Distribution of measurements: {simulation_results}")